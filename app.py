@@ -1,18 +1,32 @@
 import csv
+import functools
+import gzip
 import io
+import logging
 import os
+import queue
+import re
 import sqlite3
-import subprocess
-import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Iterable, Iterator, List, Tuple
 
 from flask import Flask, Response, flash, redirect, render_template, request, url_for
+from flask_caching import Cache
 
 
+logger = logging.getLogger(__name__)
+
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = BASE_DIR / "jobtracker.db"
+POOL_SIZE = 8
+DASHBOARD_CACHE_SECONDS = 60
+FINISHED_JOB_STATUSES = ("succeeded", "failed")
+# Stored in PRAGMA user_version; bump it whenever init_db gains tables or indexes.
+SCHEMA_VERSION = 2
 
 STATUS_KEYWORDS = {
     "rejected": [
@@ -34,86 +48,124 @@ STATUS_KEYWORDS = {
     "applied": ["applied", "submitted", "received", "under review", "in progress"],
 }
 
+_CANONICAL = {
+    "rejected": "Rejected",
+    "offer": "Offer",
+    "onsite": "Onsite",
+    "interview": "Interview",
+    "ranked": "Ranked",
+    "applied": "Applied",
+}
+
+# One compiled alternation per category, tried in STATUS_KEYWORDS priority order.
+# A single alternation over every keyword would return the leftmost match rather
+# than the highest-priority one (e.g. "applied - not selected" must be Rejected).
+_STATUS_PATTERNS = tuple(
+    (_CANONICAL[target], re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE))
+    for target, keywords in STATUS_KEYWORDS.items()
+)
+
 # Mapping presets to a display label for UI
 PRESETS = {"waterlooworks": "WaterlooWorks"}
 
+EXPORT_COLUMNS = [
+    "company",
+    "role",
+    "location",
+    "status",
+    "applied_date",
+    "follow_up_date",
+    "source",
+    "notes",
+    "url",
+]
+
+
+# Imports run one at a time off the request thread; the page polls the job row.
+_IMPORT_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="import")
+
+cache = Cache(config={"CACHE_TYPE": "SimpleCache", "CACHE_DEFAULT_TIMEOUT": DASHBOARD_CACHE_SECONDS})
+
+
+class Echo:
+    """File-like object whose write() hands the line back for streaming."""
+
+    def write(self, value: str) -> str:
+        return value
+
 
+def gzip_stream(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Gzip a text stream incrementally, yielding compressed bytes as they are produced."""
+    buffer = io.BytesIO()
+    # Level 6 gets most of the size win of level 9 at a fraction of the CPU per request.
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=6) as compressor:
+        for chunk in chunks:
+            compressor.write(chunk.encode("utf-8"))
+            if buffer.tell():
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue()
+
+
+# Portals reuse a handful of labels, so repeat lookups are served from the cache.
+@functools.lru_cache(maxsize=256)
 def normalize_status(raw_status: str) -> str:
     """Map messy labels like 'unfilled'/'filled' into canonical statuses."""
     text = (raw_status or "").strip()
-    lowered = text.lower()
-    for target, keywords in STATUS_KEYWORDS.items():
-        if any(keyword in lowered for keyword in keywords):
-            return {
-                "rejected": "Rejected",
-                "offer": "Offer",
-                "onsite": "Onsite",
-                "interview": "Interview",
-                "ranked": "Ranked",
-                "applied": "Applied",
-            }[target]
+    for label, pattern in _STATUS_PATTERNS:
+        if pattern.search(text):
+            return label
     return text.title() if text else "Applied"
 
 
 def create_app() -> Flask:
     app = Flask(__name__)
     app.config["SECRET_KEY"] = "dev-key-change-me"
+    cache.init_app(app)
 
     ensure_database()
+    # Only the web app runs import jobs, so the crawler CLI must not do this.
+    fail_interrupted_imports()
 
     @app.route("/")
     def dashboard():
-        conn = get_db()
-        stats = fetch_stats(conn)
-        stage_breakdown = fetch_stage_breakdown(conn)
-        monthly_velocity = fetch_monthly_velocity(conn)
-        recent = conn.execute(
-            "SELECT * FROM applications ORDER BY applied_date DESC LIMIT 5"
-        ).fetchall()
-        return render_template(
-            "dashboard.html",
-            stats=stats,
-            recent=recent,
-            stage_breakdown=stage_breakdown,
-            monthly_velocity=monthly_velocity,
-        )
+        return render_template("dashboard.html", **load_dashboard())
 
     @app.route("/applications")
     def applications():
-        conn = get_db()
-        rows = conn.execute(
-            "SELECT * FROM applications ORDER BY applied_date DESC, id DESC"
-        ).fetchall()
+        with get_db() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, company, role, location, status, applied_date, follow_up_date, source, url
+                FROM applications
+                ORDER BY applied_date DESC, id DESC
+                """
+            ).fetchall()
         return render_template("applications.html", applications=rows)
 
     @app.route("/applications/export")
     def export_applications():
-        conn = get_db()
-        rows = conn.execute(
-            "SELECT company, role, location, status, applied_date, follow_up_date, source, notes, url FROM applications ORDER BY applied_date DESC"
-        ).fetchall()
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(
-            [
-                "company",
-                "role",
-                "location",
-                "status",
-                "applied_date",
-                "follow_up_date",
-                "source",
-                "notes",
-                "url",
-            ]
-        )
-        writer.writerows(rows)
-        output.seek(0)
-        return Response(
-            output.read(),
-            mimetype="text/csv",
-            headers={"Content-Disposition": "attachment; filename=applications.csv"},
-        )
+        def generate():
+            # Stream one CSV line per row instead of buffering the whole file.
+            writer = csv.writer(Echo())
+            yield writer.writerow(EXPORT_COLUMNS)
+            with get_db() as conn:
+                cursor = conn.execute(
+                    f"SELECT {', '.join(EXPORT_COLUMNS)} FROM applications ORDER BY applied_date DESC, id DESC"
+                )
+                for row in cursor:
+                    yield writer.writerow(row)
+
+        body = generate()
+        headers = {
+            "Content-Disposition": "attachment; filename=applications.csv",
+            "Vary": "Accept-Encoding",
+        }
+        if request.accept_encodings["gzip"]:
+            body = gzip_stream(body)
+            headers["Content-Encoding"] = "gzip"
+        return Response(body, mimetype="text/csv", headers=headers)
 
     @app.route("/import", methods=["GET", "POST"])
     def import_applications():
@@ -123,64 +175,76 @@ def create_app() -> Flask:
             if not username or not password:
                 flash("Username and password are required.", "danger")
                 return redirect(url_for("import_applications"))
-            try:
-                # Run crawler in a subprocess to avoid blocking the Flask app and to keep credentials out of logs.
-                env = {**os.environ, "WW_USERNAME": username, "WW_PASSWORD": password}
-                result = subprocess.run(
-                    [sys.executable, "crawler.py", "--preset", "waterlooworks"],
-                    capture_output=True,
-                    text=True,
-                    env=env,
-                    cwd=BASE_DIR,
-                    check=True,
-                )
-                flash(result.stdout.strip() or "Imported applications.", "success")
-            except subprocess.CalledProcessError as err:
-                message = err.stderr.strip() or err.stdout.strip() or str(err)
-                flash(f"Import failed: {message}", "danger")
-            return redirect(url_for("applications"))
+            with get_db() as conn:
+                job_id = conn.execute(
+                    "INSERT INTO import_jobs (status, created_at) VALUES ('queued', ?)",
+                    (datetime.now().isoformat(timespec="seconds"),),
+                ).lastrowid
+            _IMPORT_EXECUTOR.submit(run_import_job, app, job_id, username, password)
+            flash("Import started.", "info")
+            return redirect(url_for("import_status", job_id=job_id))
         return render_template("import.html")
 
+    @app.route("/import/status/<int:job_id>")
+    def import_status(job_id: int):
+        with get_db() as conn:
+            job = conn.execute("SELECT * FROM import_jobs WHERE id = ?", (job_id,)).fetchone()
+        if not job:
+            flash("Import job not found.", "danger")
+            return redirect(url_for("import_applications"))
+        return render_template(
+            "import_status.html", job=job, finished=job["status"] in FINISHED_JOB_STATUSES
+        )
+
     @app.route("/applications/new", methods=["GET", "POST"])
     def add_application():
         if request.method == "POST":
-            conn = get_db()
             data = form_to_application(request.form)
-            conn.execute(
-                """
-                INSERT INTO applications
-                (company, role, location, status, applied_date, follow_up_date, source, notes, url)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                data_to_tuple(data),
-            )
-            conn.commit()
+            try:
+                with get_db() as conn:
+                    conn.execute(
+                        """
+                        INSERT INTO applications
+                        (company, role, location, status, applied_date, follow_up_date, source, notes, url)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        data_to_tuple(data),
+                    )
+            except sqlite3.IntegrityError:
+                flash(f"{data['company']} – {data['role']} is already tracked.", "danger")
+                return redirect(url_for("applications"))
+            cache.delete_memoized(load_dashboard)
             flash("Application added.", "success")
             return redirect(url_for("applications"))
         return render_template("form.html", application=None, action="Add")
 
     @app.route("/applications/<int:app_id>/edit", methods=["GET", "POST"])
     def edit_application(app_id: int):
-        conn = get_db()
-        existing = conn.execute(
-            "SELECT * FROM applications WHERE id = ?", (app_id,)
-        ).fetchone()
+        with get_db() as conn:
+            existing = conn.execute(
+                "SELECT * FROM applications WHERE id = ?", (app_id,)
+            ).fetchone()
         if not existing:
             flash("Application not found.", "danger")
             return redirect(url_for("applications"))
 
         if request.method == "POST":
             data = form_to_application(request.form)
-            conn.execute(
-                """
-                UPDATE applications
-                SET company = ?, role = ?, location = ?, status = ?, applied_date = ?,
-                    follow_up_date = ?, source = ?, notes = ?, url = ?
-                WHERE id = ?
-                """,
-                (*data_to_tuple(data), app_id),
-            )
-            conn.commit()
+            try:
+                with get_db() as conn:
+                    conn.execute(
+                        """
+                        UPDATE applications
+                        SET company = ?, role = ?, location = ?, status = ?, applied_date = ?,
+                            follow_up_date = ?, source = ?, notes = ?, url = ?
+                        WHERE id = ?
+                        """,
+                        (*data_to_tuple(data), app_id),
+                    )
+            except sqlite3.IntegrityError:
+                flash(f"{data['company']} – {data['role']} is already tracked.", "danger")
+                return redirect(url_for("applications"))
+            cache.delete_memoized(load_dashboard)
             flash("Application updated.", "success")
             return redirect(url_for("applications"))
 
@@ -188,9 +252,9 @@ def create_app() -> Flask:
 
     @app.route("/applications/<int:app_id>/delete", methods=["POST"])
     def delete_application(app_id: int):
-        conn = get_db()
-        conn.execute("DELETE FROM applications WHERE id = ?", (app_id,))
-        conn.commit()
+        with get_db() as conn:
+            conn.execute("DELETE FROM applications WHERE id = ?", (app_id,))
+        cache.delete_memoized(load_dashboard)
         flash("Application deleted.", "info")
         return redirect(url_for("applications"))
 
@@ -198,23 +262,108 @@ def create_app() -> Flask:
 
 
 def ensure_database() -> None:
-    init_db()
-    conn = get_db()
-    count = conn.execute("SELECT COUNT(*) FROM applications").fetchone()[0]
-    if count == 0:
-        seed_sample_data(conn)
-        conn.commit()
+    """Create and seed the schema once; afterwards this is a single PRAGMA read."""
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with get_db() as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        # WAL is persisted in the database file, so readers no longer block behind writers.
+        # The journal mode cannot be changed inside a transaction.
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Schema, seed rows and the version bump commit together: one fsync, never half-built.
+        with transaction(conn):
+            init_db(conn)
+            # Only databases created before user_version was tracked can already hold rows.
+            if conn.execute("SELECT 1 FROM applications LIMIT 1").fetchone() is None:
+                seed_sample_data(conn)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+
+def run_import_job(app: Flask, job_id: int, username: str, password: str) -> None:
+    """Run the crawler for one import job and record the outcome on its row."""
+    try:
+        with get_db() as conn:
+            conn.execute("UPDATE import_jobs SET status = 'running' WHERE id = ?", (job_id,))
+        # Imported lazily: crawler.core imports this module for the DB helpers.
+        from crawler.core import run_import
+
+        count = run_import(username, password)
+        status, message = "succeeded", f"Imported or updated {count} applications."
+    except Exception as err:  # Login and browser failures alike must not leave the job "running".
+        app.logger.exception("Import job %s failed", job_id)
+        status, message = "failed", str(err) or err.__class__.__name__
+    try:
+        with get_db() as conn:
+            conn.execute(
+                "UPDATE import_jobs SET status = ?, message = ?, finished_at = ? WHERE id = ?",
+                (status, message, datetime.now().isoformat(timespec="seconds"), job_id),
+            )
+    except sqlite3.Error:
+        app.logger.exception("Could not record the outcome of import job %s", job_id)
+    with app.app_context():
+        cache.delete_memoized(load_dashboard)
 
 
-def get_db() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+def fail_interrupted_imports() -> None:
+    """Close out jobs left queued/running by a server that stopped mid-import."""
+    with get_db() as conn:
+        conn.execute(
+            f"""
+            UPDATE import_jobs
+            SET status = 'failed', message = 'Interrupted by a server restart.', finished_at = ?
+            WHERE status NOT IN ({', '.join('?' for _ in FINISHED_JOB_STATUSES)})
+            """,
+            (datetime.now().isoformat(timespec="seconds"), *FINISHED_JOB_STATUSES),
+        )
+
+
+_POOL: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=POOL_SIZE)
+
+
+def _connect() -> sqlite3.Connection:
+    # Autocommit mode: multi-statement writes opt in via transaction().
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-20000")
     return conn
 
 
-def init_db() -> None:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = get_db()
+@contextmanager
+def get_db() -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled connection so SQLite's page cache stays warm between requests."""
+    try:
+        conn = _POOL.get_nowait()
+    except queue.Empty:
+        conn = _connect()
+    try:
+        yield conn
+    finally:
+        # Never hand a connection back mid-transaction.
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _POOL.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run a block as one write transaction, taking the write lock up front."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def init_db(conn: sqlite3.Connection) -> None:
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS applications (
@@ -231,7 +380,58 @@ def init_db() -> None:
         )
         """
     )
-    conn.commit()
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_app_status ON applications(status)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS ix_app_applied_date ON applications(applied_date DESC, id DESC)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS import_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            status TEXT NOT NULL,
+            message TEXT,
+            created_at TEXT NOT NULL,
+            finished_at TEXT
+        )
+        """
+    )
+    merge_duplicate_applications(conn)
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_app_company_role ON applications(company, role)"
+    )
+    # The unique index serves the same lookups; the plain one only slowed writes.
+    conn.execute("DROP INDEX IF EXISTS ix_app_company_role")
+
+
+def merge_duplicate_applications(conn: sqlite3.Connection) -> None:
+    """Make (company, role) unique without losing rows added before it was enforced.
+
+    Manual adds never checked for repeats (e.g. re-applying in a later term). For each
+    pair the most recently applied row stays; the others move to applications_duplicates.
+    """
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS applications_duplicates AS SELECT * FROM applications WHERE 0"
+    )
+    superseded = """
+        SELECT id FROM applications AS older
+        WHERE EXISTS (
+            SELECT 1 FROM applications AS newer
+            WHERE newer.company = older.company AND newer.role = older.role
+              AND (newer.applied_date > older.applied_date
+                   OR (newer.applied_date = older.applied_date AND newer.id > older.id))
+        )
+    """
+    moved = conn.execute(
+        f"INSERT INTO applications_duplicates SELECT * FROM applications WHERE id IN ({superseded})"
+    ).rowcount
+    if moved:
+        conn.execute(f"DELETE FROM applications WHERE id IN ({superseded})")
+        logger.warning(
+            "Moved %d older duplicate company/role application(s) to the "
+            "applications_duplicates table in %s; their notes and dates are kept there.",
+            moved,
+            DB_PATH.name,
+        )
 
 
 def seed_sample_data(conn: sqlite3.Connection) -> None:
@@ -336,50 +536,55 @@ def data_to_tuple(data: dict) -> Tuple[str, ...]:
     )
 
 
-def upsert_application(conn: sqlite3.Connection, data: Dict[str, str]) -> None:
-    """Insert or update an application keyed by company + role."""
-    normalized = {**data}
-    normalized["status"] = normalize_status(data.get("status", "Applied"))
-    existing = conn.execute(
-        "SELECT id FROM applications WHERE company = ? AND role = ?",
-        (normalized["company"], normalized["role"]),
-    ).fetchone()
-    if existing:
-        conn.execute(
+UPSERT_SQL = """
+    INSERT INTO applications
+    (company, role, location, status, applied_date, follow_up_date, source, notes, url)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(company, role) DO UPDATE SET
+        location = excluded.location, status = excluded.status,
+        applied_date = excluded.applied_date, follow_up_date = excluded.follow_up_date,
+        source = excluded.source, notes = excluded.notes, url = excluded.url
+"""
+
+
+@cache.memoize()
+def load_dashboard() -> dict:
+    """Dashboard aggregates, cached until the next write (or the timeout)."""
+    with get_db() as conn:
+        recent = conn.execute(
             """
-            UPDATE applications
-            SET company = ?, role = ?, location = ?, status = ?, applied_date = ?,
-                follow_up_date = ?, source = ?, notes = ?, url = ?
-            WHERE id = ?
-            """,
-            (*data_to_tuple(normalized), existing["id"]),
-        )
-    else:
-        conn.execute(
+            SELECT company, role, location, status, applied_date, follow_up_date
+            FROM applications
+            ORDER BY applied_date DESC, id DESC
+            LIMIT 5
             """
-            INSERT INTO applications
-            (company, role, location, status, applied_date, follow_up_date, source, notes, url)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            data_to_tuple(normalized),
-        )
-    conn.commit()
+        ).fetchall()
+        stage_breakdown, monthly_velocity = fetch_breakdowns(conn)
+        return {
+            "stats": fetch_stats(conn),
+            "stage_breakdown": stage_breakdown,
+            "monthly_velocity": monthly_velocity,
+            # sqlite3.Row cannot be pickled into the cache.
+            "recent": [dict(row) for row in recent],
+        }
 
 
 def fetch_stats(conn: sqlite3.Connection) -> dict:
-    total = conn.execute("SELECT COUNT(*) FROM applications").fetchone()[0]
-    interviews = conn.execute(
+    row = conn.execute(
         """
-        SELECT COUNT(*) FROM applications
-        WHERE status IN ('Phone Screen', 'Interview', 'Onsite', 'Offer', 'Ranked')
+        SELECT COUNT(*) AS total,
+               SUM(CASE WHEN status IN ('Phone Screen', 'Interview', 'Onsite', 'Offer', 'Ranked')
+                   THEN 1 ELSE 0 END) AS interviews,
+               SUM(CASE WHEN status = 'Offer' THEN 1 ELSE 0 END) AS offers,
+               SUM(CASE WHEN status != 'Applied' THEN 1 ELSE 0 END) AS responded
+        FROM applications
         """
-    ).fetchone()[0]
-    offers = conn.execute(
-        "SELECT COUNT(*) FROM applications WHERE status = 'Offer'"
-    ).fetchone()[0]
-    responded = conn.execute(
-        "SELECT COUNT(*) FROM applications WHERE status != 'Applied'"
-    ).fetchone()[0]
+    ).fetchone()
+    # SUM() over an empty table is NULL, so fall back to zero.
+    total = row["total"]
+    interviews = row["interviews"] or 0
+    offers = row["offers"] or 0
+    responded = row["responded"] or 0
     response_rate = round((responded / total) * 100, 1) if total else 0
     return {
         "total": total,
@@ -389,28 +594,23 @@ def fetch_stats(conn: sqlite3.Connection) -> dict:
     }
 
 
-def fetch_stage_breakdown(conn: sqlite3.Connection) -> List[Tuple[str, int]]:
-    rows = conn.execute(
-        """
-        SELECT status, COUNT(*) as count
-        FROM applications
-        GROUP BY status
-        ORDER BY count DESC
-        """
-    ).fetchall()
-    return [(row["status"], row["count"]) for row in rows]
-
-
-def fetch_monthly_velocity(conn: sqlite3.Connection) -> List[Tuple[str, int]]:
+def fetch_breakdowns(conn: sqlite3.Connection) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+    """Stage breakdown and monthly velocity, both rolled up from one grouped scan."""
     rows = conn.execute(
         """
-        SELECT strftime('%Y-%m', applied_date) as month, COUNT(*) as count
+        SELECT status, strftime('%Y-%m', applied_date) AS month, COUNT(*) AS count
         FROM applications
-        GROUP BY month
-        ORDER BY month
+        GROUP BY status, month
         """
     ).fetchall()
-    return [(row["month"], row["count"]) for row in rows]
+    stages: Counter = Counter()
+    months: Counter = Counter()
+    for row in rows:
+        stages[row["status"]] += row["count"]
+        months[row["month"]] += row["count"]
+    stage_breakdown = stages.most_common()
+    monthly_velocity = sorted(months.items(), key=lambda item: item[0] or "")
+    return stage_breakdown, monthly_velocity
 
 
 if __name__ == "__main__":
@@ -0,0 +1,3 @@
+from crawler.core import main
+
+main()
@@ -0,0 +1,256 @@
+"""
+Headless crawler to pull application statuses and auto-normalize them.
+
+Usage example (selectors will vary per site):
+    python -m crawler \
+      --login-url "https://example.com/login" \
+      --target-url "https://example.com/applications" \
+      --username "$WW_USERNAME" --password "$WW_PASSWORD" \
+      --row-selector "table#jobs tr" \
+      --company-selector "td:nth-child(1)" \
+      --role-selector "td:nth-child(2)" \
+      --status-selector "td:nth-child(3)" \
+      --location-selector "td:nth-child(4)"
+
+You can pass credentials via env vars WW_USERNAME/WW_PASSWORD.
+Install Playwright browser once: `python -m playwright install chromium`
+
+The Flask app calls run_import() in-process, so Playwright is imported once per
+server instead of once per import click.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import aiosqlite
+from playwright.async_api import (
+    TimeoutError as PlaywrightTimeoutError,
+    async_playwright,
+)
+
+from app import BASE_DIR, DB_PATH, UPSERT_SQL, data_to_tuple, ensure_database, normalize_status
+
+
+# Cookies, cache and compiled JS survive between runs, so a repeat import usually skips SSO.
+PROFILE_DIR = BASE_DIR / ".ww_profile"
+# Username of the last successful login, so another account's session is never reused.
+PROFILE_OWNER_FILE = PROFILE_DIR / "login_user"
+
+
+class CrawlError(Exception):
+    """Raised when the portal cannot be reached or rejects the login."""
+
+
+# Reads every cell for every row in one evaluation instead of one CDP round-trip per cell.
+EXTRACT_ROWS_SCRIPT = """
+(rows, selectors) => rows.map((row) =>
+  selectors.map((selector) => {
+    if (!selector) return "";
+    const cell = row.querySelector(selector);
+    return cell ? (cell.innerText || "").trim() : "";
+  })
+)
+"""
+
+
+async def save_applications(batch: List[Dict[str, Optional[str]]]) -> None:
+    """Upsert crawled rows without blocking the event loop on SQLite I/O."""
+    async with aiosqlite.connect(DB_PATH) as conn:
+        # WAL is already persisted by init_db; only per-connection settings are needed here.
+        await conn.execute("PRAGMA busy_timeout=30000")
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        await conn.executemany(UPSERT_SQL, [data_to_tuple(data) for data in batch])
+        await conn.commit()
+
+
+def reset_profile_for(username: Optional[str]) -> None:
+    """Discard the saved session unless it was created by this username."""
+    if not username:
+        return
+    try:
+        owner = PROFILE_OWNER_FILE.read_text().strip()
+    except OSError:
+        owner = None
+    if owner != username:
+        shutil.rmtree(PROFILE_DIR, ignore_errors=True)
+
+
+async def is_logged_in(page, nav_link_text: Optional[str]) -> bool:
+    """Probe for the post-login nav link left behind by a saved session."""
+    if not nav_link_text:
+        return False
+    try:
+        await page.get_by_text(nav_link_text, exact=False).first.wait_for(timeout=2000)
+    except PlaywrightTimeoutError:
+        return False
+    return True
+
+
+async def try_login(page, username: str, password: str, wait_ms: int) -> None:
+    user_selector = "input[type='email'], input[name='username'], input[id='UserName'], input[name='userid']"
+    pass_selector = "input[type='password'], input[id='Password'], input[name='password']"
+    submit_selector = "button[type='submit'], input[type='submit']"
+    try:
+        await page.fill(user_selector, username)
+        await page.fill(pass_selector, password)
+        await page.click(submit_selector)
+        await page.wait_for_timeout(wait_ms)
+    except PlaywrightTimeoutError:
+        pass
+
+
+async def crawl_and_sync(
+    login_url: str,
+    target_url: str,
+    username: Optional[str],
+    password: Optional[str],
+    row_selector: str,
+    company_selector: str,
+    role_selector: str,
+    status_selector: str,
+    location_selector: Optional[str],
+    nav_link_text: Optional[str],
+    headful: bool,
+    login_wait_ms: int,
+    source_label: str,
+) -> int:
+    ensure_database()
+    reset_profile_for(username)
+    async with async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(PROFILE_DIR, headless=not headful)
+        try:
+            page = context.pages[0] if context.pages else await context.new_page()
+            try:
+                await page.goto(login_url or target_url, timeout=10_000)
+            except PlaywrightTimeoutError:
+                raise CrawlError("login failed")  # website too slow to respond
+            if username and password and not await is_logged_in(page, nav_link_text):
+                await try_login(page, username, password, login_wait_ms)
+                # Basic check for bad credentials using common error markers.
+                content_lower = (await page.content()).lower()
+                if any(
+                    marker in content_lower
+                    for marker in [
+                        "invalid password",
+                        "incorrect password",
+                        "wrong password",
+                        "invalid login",
+                        "authentication failed",
+                    ]
+                ):
+                    raise CrawlError("password incorrect prompt")
+                PROFILE_OWNER_FILE.write_text(username)
+            if nav_link_text:
+                try:
+                    await page.get_by_text(nav_link_text, exact=False).click()
+                    await page.wait_for_timeout(1500)
+                except PlaywrightTimeoutError:
+                    pass
+            if target_url:
+                try:
+                    await page.goto(target_url, timeout=10_000)
+                except PlaywrightTimeoutError:
+                    raise CrawlError("login failed")
+
+            rows = await page.eval_on_selector_all(
+                row_selector,
+                EXTRACT_ROWS_SCRIPT,
+                [company_selector, role_selector, status_selector, location_selector or ""],
+            )
+        finally:
+            await context.close()
+
+        applied_date = date.today().isoformat()
+        batch = [
+            {
+                "company": company,
+                "role": role,
+                "location": location,
+                "status": normalize_status(status_raw),
+                "applied_date": applied_date,
+                "follow_up_date": None,
+                "source": source_label,
+                "notes": f"Imported via crawler from {target_url}",
+                "url": target_url,
+            }
+            for company, role, status_raw, location in rows
+            if company and role and status_raw
+        ]
+
+        await save_applications(batch)
+        return len(batch)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Crawl a job portal and sync statuses.")
+    parser.add_argument("--preset", choices=["waterlooworks"], help="Use built-in selector presets")
+    parser.add_argument("--login-url", help="Login page URL", default=None)
+    parser.add_argument("--target-url", help="Page containing the application table")
+    parser.add_argument("--username", help="Login username (or set WW_USERNAME)", default=os.environ.get("WW_USERNAME"))
+    parser.add_argument("--password", help="Login password (or set WW_PASSWORD)", default=os.environ.get("WW_PASSWORD"))
+    parser.add_argument("--row-selector", default="table tr", help="CSS selector for each row")
+    parser.add_argument("--company-selector", default="td:nth-child(1)", help="CSS selector for company within a row")
+    parser.add_argument("--role-selector", default="td:nth-child(2)", help="CSS selector for role within a row")
+    parser.add_argument("--status-selector", default="td:nth-child(3)", help="CSS selector for status within a row")
+    parser.add_argument("--location-selector", default=None, help="Optional CSS selector for location")
+    parser.add_argument("--nav-link-text", default=None, help="Optional nav link text to click after login")
+    parser.add_argument("--login-wait-ms", type=int, default=4000, help="Wait after logging in before scraping")
+    parser.add_argument("--headful", action="store_true", help="Run browser visibly for debugging")
+    parser.add_argument("--source-label", default="Crawler", help="Value for the 'source' field in the DB")
+
+    args = parser.parse_args(argv)
+
+    if args.preset == "waterlooworks":
+        args.login_url = args.login_url or "https://waterlooworks.uwaterloo.ca/myAccount/dashboard.htm"
+        args.target_url = args.target_url or "https://waterlooworks.uwaterloo.ca/myAccount/dashboard.htm"
+        args.row_selector = args.row_selector or "table tbody tr"
+        args.company_selector = args.company_selector or "td:nth-child(2)"
+        args.role_selector = args.role_selector or "td:nth-child(3)"
+        args.status_selector = args.status_selector or "td:nth-child(4)"
+        args.location_selector = args.location_selector or "td:nth-child(5)"
+        args.nav_link_text = args.nav_link_text or "Postings / Applications"
+        args.source_label = args.source_label or "WaterlooWorks"
+
+    return args
+
+
+def run(args: argparse.Namespace) -> int:
+    return asyncio.run(
+        crawl_and_sync(
+            login_url=args.login_url or args.target_url,
+            target_url=args.target_url,
+            username=args.username,
+            password=args.password,
+            row_selector=args.row_selector,
+            company_selector=args.company_selector,
+            role_selector=args.role_selector,
+            status_selector=args.status_selector,
+            location_selector=args.location_selector,
+            nav_link_text=args.nav_link_text,
+            headful=args.headful,
+            login_wait_ms=args.login_wait_ms,
+            source_label=args.source_label,
+        )
+    )
+
+
+def run_import(username: str, password: str) -> int:
+    """Run the WaterlooWorks preset with the given credentials; used by the web app."""
+    args = parse_args(["--preset", "waterlooworks"])
+    args.username = username
+    args.password = password
+    return run(args)
+
+
+def main() -> None:
+    args = parse_args()
+    try:
+        count = run(args)
+    except CrawlError as err:
+        print(err)
+        raise SystemExit(1)
+    print(f"Imported or updated {count} applications.")